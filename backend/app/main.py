@@ -1,23 +1,38 @@
 from __future__ import annotations
 import asyncio
 import json
+import math
 import os
-from datetime import datetime
+import time
+import warnings
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import joblib
 import numpy as np
-import pandas as pd
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+import orjson
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, PlainTextResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, PlainTextResponse, Response
 from pydantic import BaseModel
 
+try:
+    import tl2cgen  # type: ignore
+except Exception:
+    tl2cgen = None  # type: ignore
+
 MODEL_ENV = os.getenv("MODEL_PATH")
+SCHEMA_ENV = os.getenv("SCHEMA_PATH")
+# Opt-in int8 leaf quantization for RandomForest models (see _quantize_leaves)
+QUANTIZE_LEAVES = os.getenv("QUANTIZE_LEAVES", "0") == "1"
+LEAF_SCALE = 1.0 / 127
 DEFAULT_MODEL_PATH = Path(__file__).resolve().parents[2] / "ml" / "models" / "model.joblib"
 
-app = FastAPI(title="AI IDS Backend", version="0.1.0")
+app = FastAPI(title="AI IDS Backend", version="0.1.0", default_response_class=ORJSONResponse)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -31,6 +46,10 @@ class PredictRequest(BaseModel):
     features: Dict[str, Any]
 
 
+class IngestBatchRequest(BaseModel):
+    batch: List[Dict[str, Any]]
+
+
 class PredictResponse(BaseModel):
     malicious: bool
     score: Optional[float] = None
@@ -45,6 +64,10 @@ class Alert(BaseModel):
     features: Dict[str, Any]
 
 
+BROADCAST_BATCH = 50
+HELLO_FRAME = orjson.dumps({"type": "hello", "message": "connected"})
+
+
 class ConnectionManager:
     def __init__(self) -> None:
         self.active: List[WebSocket] = []
@@ -57,52 +80,366 @@ class ConnectionManager:
         if websocket in self.active:
             self.active.remove(websocket)
 
-    async def broadcast(self, message: dict):
+    async def broadcast(self, buf: bytes):
+        # Fan pre-encoded JSON out concurrently, yielding to the loop between chunks
+        targets = list(self.active)
         dead = []
-        for ws in self.active:
-            try:
-                await ws.send_json(message)
-            except Exception:
-                dead.append(ws)
+        for start in range(0, len(targets), BROADCAST_BATCH):
+            chunk = targets[start:start + BROADCAST_BATCH]
+            results = await asyncio.gather(*[ws.send_bytes(buf) for ws in chunk], return_exceptions=True)
+            dead.extend(ws for ws, r in zip(chunk, results) if isinstance(r, Exception))
+            await asyncio.sleep(0)
         for ws in dead:
             self.disconnect(ws)
 
 
 manager = ConnectionManager()
-RECENT_ALERTS: List[Alert] = []
+# Alerts are encoded to JSON once when recorded; the same bytes feed WebSocket
+# broadcasts and /alerts/recent
 RECENT_LIMIT = 200
+RECENT_ALERTS: deque[bytes] = deque(maxlen=RECENT_LIMIT)
+# Pre-encoded /alerts/recent bodies keyed by limit; cleared whenever alerts change
+_recent_cache: Dict[int, bytes] = {}
+
+model = None
+# Optional compiled forest (Treelite/TL2cgen) used in place of sklearn predict_proba
+forest = None
+# int8 malicious-class probability per (tree, node) when QUANTIZE_LEAVES is set
+leaf_table: Optional[np.ndarray] = None
+# Training-time feature layout, cached at startup so inference can fill a numpy
+# row directly instead of building a DataFrame per request.
+numeric_cols: tuple[str, ...] = ()
+categorical_cols: tuple[str, ...] = ()
+col_index: Dict[str, int] = {}
+feature_set: frozenset[str] = frozenset()
+encoder: Optional["_Encoder"] = None
+
+
+@contextmanager
+def _array_input():
+    # Sub-transformers are fitted on DataFrames; feeding them raw arrays is intended,
+    # so silence sklearn's feature-name warning for just those calls.
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        yield
+
+
+def _load_schema(model_path: Path, model_obj: Any) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    schema_path = Path(SCHEMA_ENV) if SCHEMA_ENV else model_path.with_name("schema.json")
+    if schema_path.exists():
+        schema = json.loads(schema_path.read_text())
+        return tuple(schema["numeric_cols"]), tuple(schema["categorical_cols"])
+    # Fall back to the column lists recorded by the fitted ColumnTransformer
+    pre = getattr(model_obj, "named_steps", {}).get("pre")
+    cols = {name: list(c) for name, _, c in getattr(pre, "transformers_", []) if name in ("num", "cat")}
+    return tuple(cols.get("num", [])), tuple(cols.get("cat", []))
+
+
+@dataclass
+class _Encoder:
+    """Fitted preprocessing parameters flattened for array-only inference."""
+    n_num: int
+    n_out: int
+    num_fill: np.ndarray
+    mean: np.ndarray
+    scale: np.ndarray
+    cat_fill: List[Any]
+    # category -> output column (one-hot) or category -> code (ordinal)
+    cat_maps: List[Dict[Any, Any]]
+    onehot: bool
+
+
+def _category_grid(cats: List[list]) -> np.ndarray:
+    # One row per known category (shorter columns repeat their last category) so the
+    # fitted encoder can be run over every category in a single transform call
+    depth = max(len(c) for c in cats)
+    grid = np.empty((depth, len(cats)), dtype=object)
+    for j, c in enumerate(cats):
+        grid[:, j] = [c[min(r, len(c) - 1)] for r in range(depth)]
+    return grid
+
+
+def _ordinal_codes(ordinal: Any) -> List[Dict[Any, float]]:
+    # Codes come from the fitted encoder itself so infrequent grouping is reproduced exactly
+    cats = [c.tolist() for c in ordinal.categories_]
+    with _array_input():
+        codes = ordinal.transform(_category_grid(cats))
+    return [{v: float(codes[r, j]) for r, v in enumerate(c)} for j, c in enumerate(cats)]
+
+
+def _onehot_columns(ohe: Any, offset: int) -> tuple[List[Dict[Any, int]], int]:
+    # Same idea for one-hot: read each category's output column off a transformed grid,
+    # which covers infrequent grouping and dropped categories (all zeros, so unmapped)
+    cats = [c.tolist() for c in ohe.categories_]
+    with _array_input():
+        out = ohe.transform(_category_grid(cats))
+    out = out.toarray() if hasattr(out, "toarray") else np.asarray(out)
+    names = ohe.get_feature_names_out([f"f{j}" for j in range(len(cats))])
+    maps: List[Dict[Any, int]] = []
+    start = 0
+    for j, c in enumerate(cats):
+        width = sum(1 for name in names if name.startswith(f"f{j}_"))
+        block = out[:, start:start + width]
+        mapping = {}
+        for r, v in enumerate(c):
+            hits = np.flatnonzero(block[r])
+            if len(hits):
+                mapping[v] = offset + start + int(hits[0])
+        maps.append(mapping)
+        start += width
+    return maps, offset + start
+
+
+def _build_encoder(pre: Any) -> Optional[_Encoder]:
+    # Only layouts produced by ml/utils/preprocess.build_preprocessor are supported;
+    # anything else falls back to running the fitted transformers.
+    try:
+        steps = {name: trans for name, trans, _ in pre.transformers_}
+        n_num = len(numeric_cols)
+        num_fill = mean = scale = np.empty(0)
+        if n_num:
+            num = steps["num"].named_steps
+            num_fill = num["imputer"].statistics_.astype(np.float64)
+            if np.isnan(num_fill).any():
+                return None  # all-NaN training columns are dropped by the imputer
+            mean = num["scaler"].mean_
+            scale = num["scaler"].scale_
+        cat_fill: List[Any] = []
+        cat_maps: List[Dict[Any, Any]] = []
+        offset = n_num
+        onehot = False
+        if categorical_cols:
+            cat = steps["cat"].named_steps
+            if "ordinal" in cat:
+                cat_maps = _ordinal_codes(cat["ordinal"])
+                cat_fill = [np.nan] * len(cat_maps)
+                offset += len(cat_maps)
+            else:
+                # One-hot layout from models trained before the ordinal encoder
+                onehot = True
+                cat_fill = list(cat["imputer"].statistics_)
+                cat_maps, offset = _onehot_columns(cat["onehot"], offset)
+        return _Encoder(n_num, offset, num_fill, mean, scale, cat_fill, cat_maps, onehot)
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+
+def _load_forest(model_path: Path):
+    # Libraries are built ahead of time (ml/compile_model.py or train.py --compile);
+    # startup only loads one that is at least as new as the model.
+    if tl2cgen is None:
+        return None
+    libpath = model_path.with_suffix(".so")
+    if not libpath.exists() or libpath.stat().st_mtime < model_path.stat().st_mtime:
+        return None
+    try:
+        predictor = tl2cgen.Predictor(str(libpath))
+        print(f"[INFO] Loaded compiled model from {libpath}")
+        return predictor
+    except Exception as e:
+        print(f"[WARN] Could not load {libpath}, using sklearn inference: {e}")
+        return None
+
+
+def _quantize_leaves(clf: Any) -> Optional[np.ndarray]:
+    # Only random forests expose per-tree leaf values through apply()/tree_.value;
+    # gradient-boosted models keep raw float leaves.
+    if not hasattr(clf, "estimators_") or len(getattr(clf, "classes_", [])) != 2:
+        return None
+    trees = [est.tree_ for est in clf.estimators_]
+    table = np.zeros((len(trees), max(t.node_count for t in trees)), dtype=np.int8)
+    for i, t in enumerate(trees):
+        v = t.value[:, 0, :]
+        # tree_.value holds counts or fractions depending on the sklearn version
+        p = v[:, 1] / np.maximum(v.sum(axis=1), 1e-12)
+        table[i, :t.node_count] = np.round(p / LEAF_SCALE).astype(np.int8)
+    print(f"[INFO] Quantized {len(trees)} trees to int8 leaves ({table.nbytes >> 20} MiB)")
+    return table
+
+
+def _quantized_scores(clf: Any, X: np.ndarray) -> np.ndarray:
+    leaves = clf.apply(X)  # (rows, trees) leaf node ids
+    q = leaf_table[np.arange(leaf_table.shape[0]), leaves]
+    return q.sum(axis=1, dtype=np.int32) * (LEAF_SCALE / leaf_table.shape[0])
 
 
 @app.on_event("startup")
 def load_model():
-    global model
+    global model, forest, leaf_table, encoder, numeric_cols, categorical_cols, col_index, feature_set
     model_path = Path(MODEL_ENV) if MODEL_ENV else DEFAULT_MODEL_PATH
     if not model_path.exists():
         app.logger = getattr(app, "logger", None)
         print(f"[WARN] Model file not found at {model_path}. Train and place it there or set MODEL_PATH.")
         model = None
         return
-    model = joblib.load(model_path)
-    print(f"[INFO] Loaded model from {model_path}")
-
-
-def predict_from_features(features: Dict[str, Any]) -> tuple[bool, Optional[float]]:
+    # Memory-map the model's numpy arrays so multiple uvicorn workers share the same pages
+    model = joblib.load(model_path, mmap_mode="r")
+    numeric_cols, categorical_cols = _load_schema(model_path, model)
+    col_index = {c: i for i, c in enumerate(numeric_cols + categorical_cols)}
+    feature_set = frozenset(col_index)
+    print(f"[INFO] Loaded model from {model_path} ({len(col_index)} features)")
+    if hasattr(model, "named_steps"):
+        encoder = _build_encoder(model.named_steps["pre"])
+        forest = _load_forest(model_path)
+        if forest is None and QUANTIZE_LEAVES:
+            leaf_table = _quantize_leaves(model.named_steps["clf"])
+
+
+def _coerce(name: str, i: int, v: Any) -> Any:
+    if i < len(numeric_cols):
+        try:
+            v = float(v)
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f"feature {name!r} must be numeric") from None
+        if v != v:
+            return np.nan
+        if not math.isfinite(v):
+            raise ValueError(f"feature {name!r} must be finite")
+        return v
+    if isinstance(v, (str, int, float)):
+        return v
+    raise ValueError(f"feature {name!r} must be a string or number")
+
+
+def _features_to_rows(batch: List[Dict[str, Any]]) -> tuple[np.ndarray, List[Optional[str]]]:
+    """Fill one row per feature dict; returns the rows and a per-row error (None if valid)."""
+    # Missing features stay NaN so the fitted imputers fill them in
+    buf = np.full((len(batch), len(col_index)), np.nan, dtype=object)
+    errors: List[Optional[str]] = [None] * len(batch)
+    for r, features in enumerate(batch):
+        try:
+            # Set intersection walks the smaller side, dropping unknown keys up front
+            for k in features.keys() & feature_set:
+                v = features[k]
+                if v is not None:
+                    i = col_index[k]
+                    buf[r, i] = _coerce(k, i, v)
+        except ValueError as e:
+            errors[r] = str(e)
+            buf[r] = np.nan
+    return buf, errors
+
+
+def _transform(buf: np.ndarray) -> np.ndarray:
+    # Apply the ColumnTransformer's fitted sub-pipelines to array slices directly,
+    # skipping its pandas column lookup.
+    n_num = len(numeric_cols)
+    parts = []
+    with _array_input():
+        for name, trans, _ in model.named_steps["pre"].transformers_:
+            if name == "num" and n_num:
+                parts.append(trans.transform(buf[:, :n_num].astype(np.float64)))
+            elif name == "cat" and categorical_cols:
+                parts.append(trans.transform(buf[:, n_num:]))
+    return np.hstack(parts)
+
+
+def _encode(buf: np.ndarray) -> np.ndarray:
+    # Impute, scale and encode categoricals straight into a float64 matrix, matching
+    # ColumnTransformer.transform so served scores equal the ones train.py reports
+    n, n_num = buf.shape[0], encoder.n_num
+    X = np.zeros((n, encoder.n_out), dtype=np.float64)
+    if n_num:
+        num = buf[:, :n_num].astype(np.float64)
+        num = np.where(np.isnan(num), encoder.num_fill, num)
+        # Divide like StandardScaler does; multiplying by 1/scale is off by an ulp on
+        # some rows, enough to flip splits that sit exactly on a training value
+        X[:, :n_num] = (num - encoder.mean) / encoder.scale
+    for j, (mapping, fill) in enumerate(zip(encoder.cat_maps, encoder.cat_fill)):
+        col = buf[:, n_num + j]
+        for r in range(n):
+            v = col[r]
+            if isinstance(v, float) and v != v:
+                v = fill
+            if encoder.onehot:
+                # Unknown categories encode as all zeros (handle_unknown="ignore")
+                idx = mapping.get(v)
+                if idx is not None:
+                    X[r, idx] = 1.0
+            else:
+                # Missing and unknown categories are NaN, which the model treats as missing
+                X[r, n_num + j] = mapping.get(v, np.nan)
+    return X
+
+
+def _score(buf: np.ndarray) -> List[tuple[bool, Optional[float]]]:
+    if encoder is not None:
+        X = _encode(buf)
+        est = model.named_steps["clf"]
+    elif hasattr(model, "named_steps"):
+        X = _transform(buf)
+        est = model.named_steps["clf"]
+    else:
+        X, est = buf, model
+    if forest is not None:
+        # Feed the library its own threshold precision so splits match the sklearn model
+        out = forest.predict(tl2cgen.DMatrix(np.asarray(X, dtype=forest.threshold_type), dtype=forest.threshold_type))
+        # Output is (rows, targets, classes); the last column is the malicious class
+        scores = np.asarray(out).reshape(X.shape[0], -1)[:, -1]
+        return [(s >= 0.5, s) for s in scores.tolist()]
+    if leaf_table is not None:
+        scores = _quantized_scores(est, X)
+        return [(s >= 0.5, s) for s in scores.tolist()]
+    if hasattr(est, "predict_proba"):
+        scores = est.predict_proba(X)[:, 1]
+        return [(s >= 0.5, s) for s in scores.tolist()]
+    else:
+        pred = est.predict(X)
+        return [(bool(p == 1), None) for p in pred]
+
+
+def predict_batch(batch: List[Dict[str, Any]]) -> tuple[List[tuple[bool, Optional[float]]], List[Optional[str]]]:
+    """Score a batch; returns (results, errors). Rows with an error are reported benign with no score."""
+    results: List[tuple[bool, Optional[float]]] = [(False, None)] * len(batch)
     if model is None:
         # No model: return benign by default
-        return False, None
-    df = pd.DataFrame([features])
-    # Align model pipeline expects training-time columns via ColumnTransformer; it will ignore unknowns if configured
+        return results, [None] * len(batch)
+    buf, errors = _features_to_rows(batch)
+    # Invalid rows are left out so they cannot change the outcome for the rest of the batch
+    valid = [r for r, e in enumerate(errors) if e is None]
+    if not valid:
+        return results, errors
     try:
-        if hasattr(model, "predict_proba"):
-            proba = model.predict_proba(df)
-            score = float(proba[:, 1][0])
-            return score >= 0.5, score
-        else:
-            pred = model.predict(df)
-            return bool(pred[0] == 1), None
+        scored = _score(buf[valid])
     except Exception as e:
         print(f"[ERROR] Prediction failed: {e}")
-        return False, None
+        if len(valid) == 1:
+            errors[valid[0]] = f"prediction failed: {e}"
+            return results, errors
+        # Re-score row by row so only the rows that actually fail are affected
+        scored = []
+        for r in valid:
+            try:
+                scored.append(_score(buf[[r]])[0])
+            except Exception as row_e:
+                errors[r] = f"prediction failed: {row_e}"
+                scored.append((False, None))
+    for r, res in zip(valid, scored):
+        results[r] = res
+    return results, errors
+
+
+def predict_from_features(features: Dict[str, Any]) -> tuple[bool, Optional[float]]:
+    results, errors = predict_batch([features])
+    if errors[0] is not None:
+        print(f"[WARN] Invalid features: {errors[0]}")
+    return results[0]
+
+
+# (epoch second, "YYYY-MM-DDTHH:MM:SS"); swapped as one tuple since /predict runs in a threadpool
+_ts_prefix: tuple[int, str] = (-1, "")
+
+
+def _now() -> tuple[int, str]:
+    """Return (epoch milliseconds, ISO-8601 UTC timestamp) from a single clock read."""
+    global _ts_prefix
+    ns = time.time_ns()
+    sec, sub_ns = divmod(ns, 1_000_000_000)
+    cached_sec, prefix = _ts_prefix
+    if sec != cached_sec:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+        _ts_prefix = (sec, prefix)
+    return ns // 1_000_000, f"{prefix}.{sub_ns // 1000:06d}Z"
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -137,32 +474,133 @@ def health():
 @app.post("/predict", response_model=PredictResponse)
 def predict(req: PredictRequest):
     malicious, score = predict_from_features(req.features)
-    ts = datetime.utcnow().isoformat() + "Z"
+    _, ts = _now()
     return PredictResponse(malicious=malicious, score=score, timestamp=ts)
 
 
+# /ingest requests (HTTP and MQTT) are queued and scored together by a single
+# consumer task, so the model runs once per batch instead of once per row.
+INGEST_BATCH_MAX = int(os.getenv("INGEST_BATCH_MAX", "256"))
+INGEST_BATCH_WAIT_S = float(os.getenv("INGEST_BATCH_WAIT_MS", "5")) / 1000
+# Created by the startup hook so it belongs to the server's event loop
+ingest_queue: Optional[asyncio.Queue] = None
+
+
+def _encode_alert(alert: Dict[str, Any]) -> Optional[bytes]:
+    try:
+        return orjson.dumps(alert)
+    except TypeError:
+        # orjson rejects e.g. integers wider than 64 bits; the stdlib encoder does not
+        try:
+            return json.dumps(alert, default=str).encode()
+        except Exception as e:
+            print(f"[WARN] Could not encode alert {alert['id']}: {e}")
+            return None
+
+
+def _record_batch(batch: List[Dict[str, Any]]) -> tuple[List[Dict[str, Any]], List[bytes]]:
+    """Score a batch of feature dicts, store malicious ones as alerts and return (responses, encoded alerts)."""
+    results, errors = predict_batch(batch)
+    base_id, ts = _now()
+    responses = []
+    alerts = []
+    for i, (features, (malicious, score), error) in enumerate(zip(batch, results, errors)):
+        if error is not None:
+            responses.append({"ingested": False, "error": error})
+            continue
+        if malicious:
+            alert = _encode_alert({
+                "id": f"{base_id}-{i}",
+                "malicious": malicious,
+                "score": score,
+                "timestamp": ts,
+                "features": features,
+            })
+            if alert is not None:
+                RECENT_ALERTS.append(alert)
+                alerts.append(alert)
+        responses.append({"ingested": True, "malicious": malicious, "score": score, "timestamp": ts})
+    if alerts:
+        _recent_cache.clear()
+    return responses, alerts
+
+
+async def _process_ingest_batch(batch: List[tuple[Dict[str, Any], asyncio.Future]]):
+    responses, alerts = _record_batch([features for features, _ in batch])
+    for (_, fut), resp in zip(batch, responses):
+        if fut.done():
+            continue
+        if resp["ingested"]:
+            fut.set_result(resp)
+        else:
+            fut.set_exception(HTTPException(status_code=422, detail=resp["error"]))
+    for alert in alerts:
+        await manager.broadcast(alert)
+
+
+async def _ingest_consumer():
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await ingest_queue.get()]
+        # Collect whatever else arrives within the batching window
+        deadline = loop.time() + INGEST_BATCH_WAIT_S
+        while len(batch) < INGEST_BATCH_MAX:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(ingest_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        try:
+            await _process_ingest_batch(batch)
+        except Exception as e:
+            print(f"[ERROR] Ingest batch failed: {e}")
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+
+
+@app.on_event("startup")
+async def start_ingest_consumer():
+    global ingest_queue
+    ingest_queue = asyncio.Queue()
+    app.state.ingest_consumer = asyncio.create_task(_ingest_consumer())
+
+
+@app.on_event("shutdown")
+async def stop_ingest_consumer():
+    app.state.ingest_consumer.cancel()
+
+
 @app.post("/ingest")
 async def ingest(req: PredictRequest):
-    malicious, score = predict_from_features(req.features)
-    ts = datetime.utcnow().isoformat() + "Z"
-    alert = Alert(
-        id=str(int(datetime.utcnow().timestamp() * 1000)),
-        malicious=malicious,
-        score=score,
-        timestamp=ts,
-        features=req.features,
-    )
-    if malicious:
-        RECENT_ALERTS.append(alert)
-        if len(RECENT_ALERTS) > RECENT_LIMIT:
-            RECENT_ALERTS.pop(0)
-        await manager.broadcast(alert.model_dump())
-    return {"ingested": True, "malicious": malicious, "score": score, "timestamp": ts}
-
-
-@app.get("/alerts/recent")
-def recent_alerts(limit: int = 50):
-    return [a.model_dump() for a in RECENT_ALERTS[-limit:]]
+    fut = asyncio.get_running_loop().create_future()
+    await ingest_queue.put((req.features, fut))
+    return await fut
+
+
+@app.post("/ingest_batch")
+async def ingest_batch(req: IngestBatchRequest):
+    # Scoring runs on the event loop, so cap the batch to bound how long it can stall it
+    if len(req.batch) > INGEST_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"batch exceeds INGEST_BATCH_MAX={INGEST_BATCH_MAX} records")
+    # Already batched by the client, so score directly instead of going through the queue
+    responses, alerts = _record_batch(req.batch)
+    for alert in alerts:
+        await manager.broadcast(alert)
+    return {"ingested": len(responses), "results": responses}
+
+
+@app.get("/alerts/recent", response_model=List[Alert])
+async def recent_alerts(limit: int = 50):
+    # async so it runs on the event loop with _record_batch and never caches a stale body
+    limit = min(max(limit, 0), RECENT_LIMIT)
+    body = _recent_cache.get(limit)
+    if body is None:
+        tail = islice(RECENT_ALERTS, max(0, len(RECENT_ALERTS) - limit), None)
+        body = _recent_cache[limit] = b"[" + b",".join(tail) + b"]"
+    return Response(content=body, media_type="application/json")
 
 
 @app.websocket("/ws/alerts")
@@ -170,7 +608,7 @@ async def ws_alerts(websocket: WebSocket):
     await manager.connect(websocket)
     try:
         # Send a hello message
-        await websocket.send_json({"type": "hello", "message": "connected"})
+        await websocket.send_bytes(HELLO_FRAME)
         while True:
             # Keep the connection alive; we don't expect client messages (ignore)
             await websocket.receive_text()
@@ -201,7 +639,7 @@ async def _handle_mqtt_payload(payload: bytes):
         print(f"[WARN] Failed to parse MQTT payload: {e}")
 
 
-def _start_mqtt():
+def _start_mqtt(loop: asyncio.AbstractEventLoop):
     if not MQTT_URL or mqtt is None:
         return
 
@@ -210,7 +648,8 @@ def _start_mqtt():
         client.subscribe(MQTT_TOPIC)
 
     def on_message(client, userdata, msg):
-        asyncio.run(_handle_mqtt_payload(msg.payload))
+        # Called from paho's network thread; hand the payload to the server loop
+        asyncio.run_coroutine_threadsafe(_handle_mqtt_payload(msg.payload), loop)
 
     client = mqtt.Client()
     # Support tcp://host:port
@@ -228,5 +667,5 @@ def _start_mqtt():
 
 
 @app.on_event("startup")
-def maybe_start_mqtt():
-    _start_mqtt()
+async def maybe_start_mqtt():
+    _start_mqtt(asyncio.get_running_loop())
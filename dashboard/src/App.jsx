@@ -22,6 +22,9 @@ function useWebSocketAlerts() {
     const url = getWsUrl()
 
     const ws = new WebSocket(url)
+    // Alerts arrive as binary (UTF-8 JSON) frames
+    ws.binaryType = 'arraybuffer'
+    const decoder = new TextDecoder()
     wsRef.current = ws
     setStatus('connecting')
 
@@ -31,7 +34,7 @@ function useWebSocketAlerts() {
 
     ws.onmessage = (ev) => {
       try {
-        const msg = JSON.parse(ev.data)
+        const msg = JSON.parse(typeof ev.data === 'string' ? ev.data : decoder.decode(ev.data))
         if (msg?.type === 'hello') return
         // Expecting: { id, malicious, score, timestamp, features }
         setAlerts((prev) => {
@@ -0,0 +1,49 @@
+import argparse
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import joblib
+
+
+def lib_path_for(model_path: Path) -> Path:
+    """Where the backend looks for the compiled library of a model."""
+    return model_path.with_suffix(".so")
+
+
+def compile_model(model_path: Path, clf: Any = None) -> Path:
+    """Compile the pipeline's tree model with Treelite/TL2cgen next to model_path.
+
+    The library is built under a temporary name and moved into place atomically, so a
+    backend starting concurrently never loads a half-written file.
+    """
+    import tl2cgen
+    import treelite
+
+    if clf is None:
+        clf = joblib.load(model_path).named_steps["clf"]
+    libpath = lib_path_for(model_path)
+    fd, tmp = tempfile.mkstemp(suffix=".so", prefix=f".{libpath.stem}-", dir=libpath.parent)
+    os.close(fd)
+    try:
+        tl_model = treelite.sklearn.import_model(clf)
+        tl2cgen.export_lib(tl_model, toolchain="gcc", libpath=tmp, params={"parallel_comp": os.cpu_count() or 1})
+        os.replace(tmp, libpath)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return libpath
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a trained model to a native library for the backend")
+    parser.add_argument("--model", default="ml/models/model.joblib", help="Path to model.joblib")
+    args = parser.parse_args()
+
+    libpath = compile_model(Path(args.model))
+    print(f"Compiled model to {libpath}")
+
+
+if __name__ == "__main__":
+    main()
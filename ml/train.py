@@ -7,12 +7,52 @@ from typing import List, Optional
 import joblib
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from sklearn.ensemble import HistGradientBoostingClassifier
 from sklearn.metrics import classification_report, roc_auc_score
 from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
 
-from utils.preprocess import build_preprocessor, infer_column_types, FeatureSchema
+from utils.preprocess import build_preprocessor, categorical_feature_indices, infer_column_types, FeatureSchema
+
+# Values that mark a column as a usable binary/benign-vs-attack label. Matched case-sensitively
+# on purpose: CICIDS-style "BENIGN"/"DDoS" labels must not match here, they belong to the
+# non-BENIGN-is-malicious fallback below.
+LABEL_VOCAB = frozenset([
+    "0", "1", "True", "False",
+    "benign", "malicious", "normal", "attack",
+    "Benign", "Malicious", "Normal", "Attack",
+])
+MALICIOUS_LABELS = ["malicious", "attack", "anomaly"]
+# Rows inspected per candidate when checking for label values
+LABEL_SAMPLE_ROWS = 2048
+# pyarrow CSV block size; larger blocks mean fewer, bigger parallel parse tasks
+CSV_BLOCK_SIZE = 16 << 20
+
+
+def _read_csv_table(path: Path, nrows: Optional[int] = None) -> pa.Table:
+    read_options = pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE)
+    # Blank/"NA" cells in string columns become nulls, as with pd.read_csv
+    convert_options = pacsv.ConvertOptions(strings_can_be_null=True)
+    try:
+        if nrows is None:
+            table = pacsv.read_csv(path, read_options=read_options, convert_options=convert_options)
+        else:
+            # Stream blocks so only the rows we need are parsed
+            reader = pacsv.open_csv(path, read_options=read_options, convert_options=convert_options)
+            batches = []
+            seen = 0
+            for batch in reader:
+                batches.append(batch)
+                seen += batch.num_rows
+                if seen >= nrows:
+                    break
+            table = pa.Table.from_batches(batches, schema=reader.schema).slice(0, nrows)
+    except pa.ArrowInvalid:
+        # pyarrow infers types from the first block; fall back for columns that change type later
+        table = pa.Table.from_pandas(pd.read_csv(path, nrows=nrows), preserve_index=False)
+    return table
 
 
 def read_csvs(path: str, nrows: Optional[int] = None) -> pd.DataFrame:
@@ -21,22 +61,20 @@ def read_csvs(path: str, nrows: Optional[int] = None) -> pd.DataFrame:
         files = sorted([f for f in p.glob("*.csv")])
         if not files:
             raise FileNotFoundError(f"No CSV files found in {path}")
-        dfs: List[pd.DataFrame] = []
+        tables: List[pa.Table] = []
         remaining = nrows
         for f in files:
-            use_nrows = None
-            if remaining is not None:
-                if remaining <= 0:
-                    break
-                use_nrows = remaining
-            df = pd.read_csv(f, nrows=use_nrows)
-            dfs.append(df)
+            if remaining is not None and remaining <= 0:
+                break
+            table = _read_csv_table(f, nrows=remaining)
+            tables.append(table)
             if remaining is not None:
-                remaining -= len(df)
-        df_all = pd.concat(dfs, ignore_index=True)
-        return df_all
+                remaining -= table.num_rows
+        # Arrow concatenation only stitches chunks; the single copy happens in to_pandas.
+        # "permissive" widens columns typed differently across files (e.g. int64 vs double).
+        return pa.concat_tables(tables, promote_options="permissive").to_pandas()
     elif p.is_file():
-        return pd.read_csv(p, nrows=nrows)
+        return _read_csv_table(p, nrows=nrows).to_pandas()
     else:
         raise FileNotFoundError(f"Path not found: {path}")
 
@@ -56,11 +94,17 @@ def infer_labels(df: pd.DataFrame, label_col: Optional[str]) -> tuple[pd.DataFra
     for cand in candidates:
         if cand not in df.columns:
             continue
-        if df[cand].dropna().isin([0, 1, "0", "1", True, False, "benign", "malicious", "normal", "attack", "Benign", "Malicious", "Normal", "Attack"]).any():
+        sample = df[cand].head(LABEL_SAMPLE_ROWS).dropna()
+        if pd.api.types.is_numeric_dtype(sample):
+            looks_binary = sample.isin([0, 1]).any()
+        else:
+            looks_binary = sample.astype(str).isin(LABEL_VOCAB).any()
+        if looks_binary:
             # Heuristic mapping
             series = df[cand]
-            if series.dtype == object:
-                y = series.str.lower().isin(["malicious", "attack", "anomaly"]).astype(int)
+            if not pd.api.types.is_numeric_dtype(series):
+                values = np.char.lower(series.to_numpy().astype("U"))
+                y = pd.Series(np.isin(values, MALICIOUS_LABELS).astype(int), index=series.index)
             else:
                 y = series.astype(float).clip(0, 1).astype(int)
             used_label_col = cand
@@ -84,7 +128,7 @@ def infer_labels(df: pd.DataFrame, label_col: Optional[str]) -> tuple[pd.DataFra
 
 
 def main():
-    parser = argparse.ArgumentParser(description="Train IDS model (RandomForest baseline)")
+    parser = argparse.ArgumentParser(description="Train IDS model (HistGradientBoosting baseline)")
     parser.add_argument("--data", required=True, help="Path to CSV file or directory of CSVs")
     parser.add_argument("--label-col", default=None, help="Optional label column name")
     parser.add_argument("--nrows", type=int, default=None, help="Limit rows for faster training")
@@ -92,6 +136,7 @@ def main():
     parser.add_argument("--random-state", type=int, default=42)
     parser.add_argument("--model-out", default="ml/models/model.joblib")
     parser.add_argument("--schema-out", default="ml/models/schema.json")
+    parser.add_argument("--compile", action="store_true", help="Also compile the model with Treelite/TL2cgen for the backend")
     args = parser.parse_args()
 
     df = read_csvs(args.data, nrows=args.nrows)
@@ -108,9 +153,8 @@ def main():
 
     preprocessor = build_preprocessor(numeric_cols, categorical_cols)
 
-    clf = RandomForestClassifier(
-        n_estimators=200,
-        n_jobs=-1,
+    clf = HistGradientBoostingClassifier(
+        categorical_features=categorical_feature_indices(numeric_cols, categorical_cols) or None,
         class_weight="balanced",
         random_state=args.random_state,
     )
@@ -140,9 +184,15 @@ def main():
 
     out_path = Path(args.model_out)
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    joblib.dump(pipe, out_path)
+    # Uncompressed so the backend can memory-map the arrays (joblib.load(mmap_mode="r"))
+    joblib.dump(pipe, out_path, compress=0)
     print(f"Saved model to {out_path}")
 
+    if args.compile:
+        from compile_model import compile_model
+        libpath = compile_model(out_path, clf)
+        print(f"Compiled model to {libpath}")
+
     schema = FeatureSchema(numeric_cols=numeric_cols, categorical_cols=categorical_cols, dropped_cols=dropped_cols)
     schema_path = Path(args.schema_out)
     schema_path.parent.mkdir(parents=True, exist_ok=True)
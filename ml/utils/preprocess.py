@@ -7,10 +7,14 @@ import numpy as np
 import pandas as pd
 from sklearn.compose import ColumnTransformer
 from sklearn.impute import SimpleImputer
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.preprocessing import OrdinalEncoder, StandardScaler
 from sklearn.pipeline import Pipeline
 
 
+# HistGradientBoostingClassifier supports at most 255 categories per feature
+MAX_CATEGORIES = 255
+
+
 @dataclass
 class FeatureSchema:
     numeric_cols: List[str]
@@ -38,16 +42,11 @@ def infer_column_types(df: pd.DataFrame, high_cardinality_threshold: int = 1000,
     # Object-like candidates
     obj_cols = df.select_dtypes(include=["object", "category"]).columns.tolist()
 
-    dropped_cols: List[str] = []
-    categorical_cols: List[str] = []
-
-    for col in obj_cols:
-        nunique = df[col].nunique(dropna=True)
-        ratio = nunique / n_rows
-        if nunique > high_cardinality_threshold or ratio > id_like_ratio:
-            dropped_cols.append(col)
-        else:
-            categorical_cols.append(col)
+    # One nunique pass over the whole object block instead of one call per column
+    nuniques = df[obj_cols].nunique(dropna=True)
+    dropped_mask = (nuniques > high_cardinality_threshold) | (nuniques / n_rows > id_like_ratio)
+    dropped_cols: List[str] = nuniques.index[dropped_mask].tolist()
+    categorical_cols: List[str] = nuniques.index[~dropped_mask].tolist()
 
     return numeric_cols, categorical_cols, dropped_cols
 
@@ -57,15 +56,17 @@ def build_preprocessor(numeric_cols: List[str], categorical_cols: List[str]) ->
         ("imputer", SimpleImputer(strategy="median")),
         ("scaler", StandardScaler(with_mean=True, with_std=True)),
     ]
-    # scikit-learn >=1.2 uses 'sparse_output'; older versions used 'sparse'
-    try:
-        ohe = OneHotEncoder(handle_unknown="ignore", sparse_output=False)  # sklearn >=1.2
-    except TypeError:
-        ohe = OneHotEncoder(handle_unknown="ignore", sparse=False)  # sklearn <1.2
-
+    # Categoricals are ordinal-coded and split natively by HistGradientBoostingClassifier,
+    # which avoids a wide one-hot matrix. Missing/unknown values become NaN, which the
+    # model routes as missing; rare categories beyond the model's 255-bin limit are
+    # grouped into a single infrequent code.
     categorical_pipeline = [
-        ("imputer", SimpleImputer(strategy="most_frequent")),
-        ("onehot", ohe),
+        ("ordinal", OrdinalEncoder(
+            handle_unknown="use_encoded_value",
+            unknown_value=np.nan,
+            encoded_missing_value=np.nan,
+            max_categories=MAX_CATEGORIES,
+        )),
     ]
 
     preprocessor = ColumnTransformer(
@@ -74,10 +75,15 @@ def build_preprocessor(numeric_cols: List[str], categorical_cols: List[str]) ->
             ("cat", Pipeline(categorical_pipeline), categorical_cols),
         ],
         remainder="drop",
-        sparse_threshold=0.3,
+        sparse_threshold=0.0,
         n_jobs=None,
         verbose_feature_names_out=False,
     )
     return preprocessor
 
 
+def categorical_feature_indices(numeric_cols: List[str], categorical_cols: List[str]) -> List[int]:
+    """Column positions of the categorical features in build_preprocessor's output."""
+    return list(range(len(numeric_cols), len(numeric_cols) + len(categorical_cols)))
+
+
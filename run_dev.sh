@@ -25,7 +25,7 @@ fi
 
 echo "[backend] Starting uvicorn on http://localhost:8000 ..."
 # When running from the backend directory, the app module is `app.main:app`, not `backend.app.main:app`
-uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload &
+uvicorn app.main:app --host 0.0.0.0 --port 8000 --loop uvloop --http httptools --reload &
 BACKEND_PID=$!
 
 deactivate || true
@@ -1,38 +1,63 @@
 import argparse
-import time
-import json
+import asyncio
 from pathlib import Path
 
+import httpx
 import pandas as pd
-import requests
+
+
+DEFAULT_BASE_URL = "http://localhost:8000"
+
+
+async def _send(client: httpx.AsyncClient, sem: asyncio.Semaphore, url: str, payload: dict):
+    try:
+        resp = await client.post(url, json=payload, timeout=5)
+        if resp.status_code != 200:
+            print(f"[WARN] HTTP {resp.status_code}: {resp.text[:200]}")
+    except Exception as e:
+        print(f"[WARN] Request failed: {e}")
+    finally:
+        sem.release()
+
+
+async def replay(args):
+    df = pd.read_csv(Path(args.csv))
+    if args.limit:
+        df = df.head(args.limit)
+    # Materialize all rows once; NaN becomes None (JSON null), which the backend treats as missing
+    records = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+    batch = max(args.batch, 1)
+    url = args.url or (f"{DEFAULT_BASE_URL}/ingest_batch" if batch > 1 else f"{DEFAULT_BASE_URL}/ingest")
+    sleep_s = batch / max(args.rate, 0.1)
+
+    sem = asyncio.Semaphore(args.concurrency)
+    tasks = []
+    # One client keeps connections alive across requests
+    async with httpx.AsyncClient() as client:
+        for start in range(0, len(records), batch):
+            if batch > 1:
+                payload = {"batch": records[start:start + batch]}
+            else:
+                payload = {"features": records[start]}
+            await sem.acquire()
+            tasks.append(asyncio.create_task(_send(client, sem, url, payload)))
+            await asyncio.sleep(sleep_s)
+        await asyncio.gather(*tasks)
+
+    print(f"Done. Sent {len(records)} rows -> {url}")
 
 
 def main():
     parser = argparse.ArgumentParser(description="Replay CSV rows to backend /ingest at a fixed rate")
     parser.add_argument("--csv", required=True, help="Path to CSV file")
-    parser.add_argument("--url", default="http://localhost:8000/ingest", help="Backend ingest URL")
+    parser.add_argument("--url", default=None, help=f"Backend ingest URL (default: {DEFAULT_BASE_URL}/ingest, or /ingest_batch with --batch > 1)")
     parser.add_argument("--rate", type=float, default=20.0, help="Rows per second")
     parser.add_argument("--limit", type=int, default=None, help="Optional limit of rows to send")
+    parser.add_argument("--batch", type=int, default=1, help="Rows per request; > 1 posts to /ingest_batch (backend accepts up to INGEST_BATCH_MAX, default 256)")
+    parser.add_argument("--concurrency", type=int, default=64, help="Maximum requests in flight")
     args = parser.parse_args()
 
-    df = pd.read_csv(Path(args.csv))
-    sleep_s = 1.0 / max(args.rate, 0.1)
-
-    sent = 0
-    for _, row in df.iterrows():
-        features = row.dropna().to_dict()
-        try:
-            resp = requests.post(args.url, json={"features": features}, timeout=5)
-            if resp.status_code != 200:
-                print(f"[WARN] HTTP {resp.status_code}: {resp.text[:200]}")
-        except Exception as e:
-            print(f"[WARN] Request failed: {e}")
-        sent += 1
-        if args.limit and sent >= args.limit:
-            break
-        time.sleep(sleep_s)
-
-    print(f"Done. Sent {sent} rows -> {args.url}")
+    asyncio.run(replay(args))
 
 
 if __name__ == "__main__":
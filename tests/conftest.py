@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+# train.py imports `utils.preprocess` relative to ml/, and the backend is imported as `backend.app.main`
+for p in (ROOT / "ml", ROOT):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
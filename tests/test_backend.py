@@ -0,0 +1,222 @@
+import numpy as np
+import joblib
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.pipeline import Pipeline
+
+from utils.preprocess import FeatureSchema, build_preprocessor, categorical_feature_indices
+
+from backend.app import main
+
+# "packets" is integer-valued, so tree thresholds land exactly on training values
+NUMERIC = ["bytes", "duration", "packets"]
+CATEGORICAL = ["proto"]
+
+
+def _synthetic(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "bytes": rng.uniform(0, 1000, n),
+        "duration": rng.uniform(0, 10, n),
+        "packets": rng.integers(1, 200, n).astype(float),
+        "proto": rng.choice(["tcp", "udp", "icmp"], n),
+    })
+    y = ((df["bytes"] > 500) | (df["packets"] > 150)).astype(int)
+    return df, y
+
+
+@pytest.fixture(scope="module")
+def model_dir(tmp_path_factory):
+    df, y = _synthetic()
+    pre = build_preprocessor(NUMERIC, CATEGORICAL)
+    clf = HistGradientBoostingClassifier(
+        categorical_features=categorical_feature_indices(NUMERIC, CATEGORICAL), random_state=0
+    )
+    pipe = Pipeline(steps=[("pre", pre), ("clf", clf)]).fit(df, y)
+    out = tmp_path_factory.mktemp("model")
+    joblib.dump(pipe, out / "model.joblib", compress=0)
+    (out / "schema.json").write_text(FeatureSchema(NUMERIC, CATEGORICAL, []).to_json())
+    return out
+
+
+@pytest.fixture
+def client(model_dir, monkeypatch):
+    monkeypatch.setattr(main, "MODEL_ENV", str(model_dir / "model.joblib"))
+    monkeypatch.setattr(main, "MQTT_URL", None)
+    with TestClient(main.app) as c:
+        yield c
+
+
+GOOD = {"bytes": 900.0, "duration": 1.0, "packets": 10.0, "proto": "tcp"}
+
+
+def test_invalid_row_does_not_affect_batch(client):
+    (alone,), _ = main.predict_batch([GOOD])
+    assert alone[0] is True
+    results, errors = main.predict_batch([GOOD, {"bytes": "abc"}, {"proto": ["tcp"]}, GOOD])
+    assert results[0] == alone and results[3] == alone
+    assert errors[0] is None and errors[3] is None
+    assert "bytes" in errors[1] and "proto" in errors[2]
+
+
+def test_ingest_rejects_only_invalid_request(client):
+    assert client.post("/ingest", json={"features": {"bytes": "abc"}}).status_code == 422
+    resp = client.post("/ingest", json={"features": GOOD})
+    assert resp.status_code == 200 and resp.json()["malicious"] is True
+
+
+def test_ingest_batch_reports_per_row_errors(client):
+    huge = dict(GOOD, extra=2 ** 70)
+    body = client.post("/ingest_batch", json={"batch": [GOOD, {"bytes": [1]}, huge]}).json()
+    ok, bad, wide = body["results"]
+    assert ok["malicious"] is True
+    assert bad["ingested"] is False and "bytes" in bad["error"]
+    # Integers orjson cannot encode still produce an alert
+    assert wide["malicious"] is True
+    recent = client.get("/alerts/recent", params={"limit": 1}).json()
+    assert recent[0]["features"]["extra"] == 2 ** 70
+
+
+def test_recent_alerts_cache_is_bounded_and_invalidated(client):
+    client.post("/ingest", json={"features": GOOD})
+    for limit in (-5, 0, 10 ** 9):
+        client.get("/alerts/recent", params={"limit": limit})
+    assert set(main._recent_cache) <= {0, main.RECENT_LIMIT}
+    before = len(client.get("/alerts/recent", params={"limit": main.RECENT_LIMIT}).json())
+    client.post("/ingest", json={"features": GOOD})
+    after = client.get("/alerts/recent", params={"limit": main.RECENT_LIMIT}).json()
+    assert len(after) == min(before + 1, main.RECENT_LIMIT)
+
+
+def _near_split_rows(pipe, n=200):
+    # Rows whose "bytes" value sits as close as float64 allows to a point where the
+    # pipeline's score changes, so any loss of precision (e.g. float32) flips a split
+    base = pd.DataFrame([GOOD])
+
+    def score(values):
+        rows = base.loc[base.index.repeat(len(values))].reset_index(drop=True)
+        rows["bytes"] = values
+        return pipe.predict_proba(rows)[:, 1]
+
+    grid = np.linspace(0, 1000, 2001)
+    s = score(grid)
+    change = np.flatnonzero(s[1:] != s[:-1])
+    lo, hi, s_lo = grid[change], grid[change + 1], s[change]
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        same = score(mid) == s_lo
+        lo, hi = np.where(same, mid, lo), np.where(same, hi, mid)
+    edge = base.loc[base.index.repeat(len(hi))].reset_index(drop=True)
+    edge["bytes"] = hi
+    # Every integer "packets" value, with bytes below the bytes split so packets decides
+    ints = base.loc[base.index.repeat(250)].reset_index(drop=True)
+    ints["bytes"], ints["packets"] = 100.0, np.arange(250, dtype=float)
+    return pd.concat([edge, ints, _synthetic(n=n, seed=1)[0]], ignore_index=True)
+
+
+def test_served_scores_match_pipeline(client, model_dir):
+    pipe = joblib.load(model_dir / "model.joblib")
+    df = _near_split_rows(pipe)
+    results, errors = main.predict_batch(df.to_dict(orient="records"))
+    assert errors == [None] * len(df)
+    np.testing.assert_array_equal([s for _, s in results], pipe.predict_proba(df)[:, 1])
+
+
+def test_compiled_scores_match_pipeline(model_dir, tmp_path, monkeypatch):
+    pytest.importorskip("tl2cgen")
+    pytest.importorskip("treelite")
+    from compile_model import compile_model
+
+    model_path = tmp_path / "model.joblib"
+    model_path.write_bytes((model_dir / "model.joblib").read_bytes())
+    (tmp_path / "schema.json").write_bytes((model_dir / "schema.json").read_bytes())
+    compile_model(model_path)
+    monkeypatch.setattr(main, "MODEL_ENV", str(model_path))
+    main.load_model()
+    try:
+        assert main.forest is not None
+        df = _near_split_rows(joblib.load(model_path))
+        results, _ = main.predict_batch(df.to_dict(orient="records"))
+        expected = joblib.load(model_path).predict_proba(df)[:, 1]
+        np.testing.assert_allclose([s for _, s in results], expected, rtol=0, atol=1e-6)
+    finally:
+        main.forest = None
+
+
+def test_ingest_batch_rejects_oversized_batch(client):
+    resp = client.post("/ingest_batch", json={"batch": [GOOD] * (main.INGEST_BATCH_MAX + 1)})
+    assert resp.status_code == 413
+
+
+def _legacy_onehot_preprocessor(max_categories=None):
+    # Layout of models trained before categoricals were ordinal-encoded
+    from sklearn.compose import ColumnTransformer
+    from sklearn.impute import SimpleImputer
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+    num = Pipeline([("imputer", SimpleImputer(strategy="median")), ("scaler", StandardScaler())])
+    cat = Pipeline([
+        ("imputer", SimpleImputer(strategy="most_frequent")),
+        ("onehot", OneHotEncoder(handle_unknown="ignore", sparse_output=False, max_categories=max_categories)),
+    ])
+    return ColumnTransformer(
+        [("num", num, NUMERIC), ("cat", cat, CATEGORICAL)], remainder="drop", verbose_feature_names_out=False
+    )
+
+
+def _parity_frame():
+    rng = np.random.default_rng(2)
+    n = 300
+    # "tcp" and "udp" are common, the rest rare enough to be grouped as infrequent
+    proto = rng.choice(["tcp", "udp"], n).astype(object)
+    proto[:6] = ["icmp", "icmp", "gre", "gre", "sctp", "esp"]
+    proto[10:20] = np.nan
+    df = pd.DataFrame({
+        "bytes": rng.uniform(0, 1000, n),
+        "duration": rng.uniform(0, 10, n),
+        "packets": rng.integers(1, 200, n).astype(float),
+        "proto": proto,
+    })
+    df.loc[20:30, "bytes"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("layout", ["ordinal", "ordinal_infrequent", "onehot", "onehot_infrequent"])
+def test_encoder_matches_column_transformer(layout, monkeypatch):
+    import utils.preprocess as preprocess
+
+    if layout.startswith("ordinal"):
+        if layout.endswith("infrequent"):
+            monkeypatch.setattr(preprocess, "MAX_CATEGORIES", 3)
+        pre = build_preprocessor(NUMERIC, CATEGORICAL)
+    else:
+        pre = _legacy_onehot_preprocessor(3 if layout.endswith("infrequent") else None)
+    pre.fit(_parity_frame())
+
+    monkeypatch.setattr(main, "numeric_cols", tuple(NUMERIC))
+    monkeypatch.setattr(main, "categorical_cols", tuple(CATEGORICAL))
+    monkeypatch.setattr(main, "col_index", {c: i for i, c in enumerate(NUMERIC + CATEGORICAL)})
+    monkeypatch.setattr(main, "feature_set", frozenset(NUMERIC + CATEGORICAL))
+    monkeypatch.setattr(main, "encoder", main._build_encoder(pre))
+    assert main.encoder is not None
+
+    rows = [
+        {"bytes": 10.0, "duration": 1.0, "proto": "tcp"},
+        {"bytes": 900.0, "duration": 2.0, "proto": "udp"},
+        {"bytes": 500.0, "duration": 3.0, "proto": "icmp"},  # infrequent when grouped
+        {"bytes": 250.0, "duration": 4.0, "proto": "esp"},  # infrequent when grouped
+        {"bytes": 50.0, "duration": 5.0, "proto": "quic"},  # unknown
+        {"duration": 6.0, "proto": "tcp"},  # missing numeric
+        {"bytes": 75.0, "duration": 7.0},  # missing categorical
+        {"bytes": 80.0, "duration": 8.0, "proto": None},
+    ]
+    # Integer-valued inputs, where an ulp of scaling error flips splits on training values
+    rows += [{"bytes": float(b), "duration": 1.0, "packets": float(p), "proto": "tcp"}
+             for b, p in zip(range(0, 1000, 5), range(200))]
+    buf, errors = main._features_to_rows(rows)
+    assert errors == [None] * len(rows)
+    expected = pre.transform(pd.DataFrame(rows, columns=NUMERIC + CATEGORICAL))
+    # Bit-for-bit: any rounding difference can move a value across a tree threshold
+    np.testing.assert_array_equal(main._encode(buf), expected)
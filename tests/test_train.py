@@ -0,0 +1,51 @@
+import pandas as pd
+
+from train import infer_labels, read_csvs
+
+
+def test_cicids_labels_use_non_benign_fallback():
+    df = pd.DataFrame({
+        "x": range(6),
+        "Label": ["BENIGN", "DDoS", "PortScan", "BENIGN", "DoS Hulk", "BENIGN"],
+    })
+    X, y, used = infer_labels(df, None)
+    assert used == "Label"
+    assert y.tolist() == [0, 1, 1, 0, 1, 0]
+    assert list(X.columns) == ["x"]
+
+
+def test_binary_string_labels():
+    df = pd.DataFrame({"x": range(4), "label": ["normal", "attack", "Normal", "malicious"]})
+    _, y, used = infer_labels(df, None)
+    assert used == "label"
+    assert y.tolist() == [0, 1, 0, 1]
+
+
+def test_numeric_labels():
+    df = pd.DataFrame({"x": range(4), "label": [0, 1, 1, 0]})
+    _, y, _ = infer_labels(df, None)
+    assert y.tolist() == [0, 1, 1, 0]
+
+
+def test_read_csvs_promotes_mixed_types_across_files(tmp_path):
+    (tmp_path / "a.csv").write_text("a,b\n1,x\n2,y\n")
+    (tmp_path / "b.csv").write_text("a,b\n1.5,x\n2.5,z\n")
+    df = read_csvs(str(tmp_path))
+    assert df["a"].tolist() == [1.0, 2.0, 1.5, 2.5]
+    assert df["b"].tolist() == ["x", "y", "x", "z"]
+
+
+def test_read_csvs_respects_nrows_across_files(tmp_path):
+    (tmp_path / "a.csv").write_text("a\n1\n2\n")
+    (tmp_path / "b.csv").write_text("a\n3\n4\n")
+    assert read_csvs(str(tmp_path), nrows=3)["a"].tolist() == [1, 2, 3]
+
+
+def test_read_csvs_keeps_blank_strings_missing(tmp_path):
+    (tmp_path / "a.csv").write_text("x,proto,Label\n1,tcp,BENIGN\n2,,\n3,NA,DDoS\n4,udp,BENIGN\n")
+    for nrows in (None, 4):
+        df = read_csvs(str(tmp_path), nrows=nrows)
+        assert df["proto"].isna().tolist() == [False, True, True, False]
+        _, y, _ = infer_labels(df, None)
+        # A missing label falls back to BENIGN rather than counting as an attack
+        assert y.tolist() == [0, 0, 1, 0]